@@ -1,5 +1,7 @@
 """Sphinx configuration."""
 
+import re
+
 import click
 from sphinx.application import Sphinx
 
@@ -15,14 +17,15 @@ extensions = [
 autodoc_typehints = "description"
 html_theme = "furo"
 
+# Escape reStructuredText * (italics) since they aren't used
+# and having unmatched * raises a warning.
+_STAR_RE = re.compile(r" \*")
+
 
 def process_description(app: Sphinx, ctx: click.Context, lines: list[str]) -> None:  # noqa: ARG001
     """Append some text to the "example" command description."""
     for index, line in enumerate(lines):
-        # Escape reStructuredText * (italics) since they aren't used
-        # and having unmatched * raises a warning.
-        if " *" in line:
-            lines[index] = line.replace(" *", " \\*")
+        lines[index] = _STAR_RE.sub(r" \\*", line)
 
 
 def setup(app: Sphinx) -> None:  # noqa: D103
@@ -1,11 +1,12 @@
 """Command-line interface."""
 
+import functools
 import importlib.metadata
 import itertools
 import math
 from dataclasses import dataclass
-from textwrap import dedent
 from typing import Generator
+from typing import Sequence
 
 import click
 import svg
@@ -17,6 +18,7 @@ PX_PER_INCH = 96  # Defined by SVG
 PX_PER_MM = PX_PER_INCH / MM_PER_INCH
 
 URL = "https://github.com/rbedia/circle-stitcher"
+SVG_NAMESPACE = "http://www.w3.org/2000/svg"
 SOFTWARE_NAME = f"circle-stitcher {importlib.metadata.version('circle_stitcher')}"
 
 
@@ -101,7 +103,10 @@ def main(mm: bool, out: click.utils.LazyFile, commands: str) -> None:
     # Cross hatch
     # "L 8,1, 22,31, 12,1, 18,31, 16,1, 14,31, 20,1, 10,31 C 33"
 
-    results = parser.parse(commands)
+    try:
+        results = parser.parse(commands)
+    except parser.ParseError as error:
+        raise click.BadParameter(str(error), param_hint="COMMANDS") from error
 
     stitcher = CircleStitcher()
     stitcher.commands_text = commands
@@ -131,12 +136,12 @@ def main(mm: bool, out: click.utils.LazyFile, commands: str) -> None:
     for state in results.statements:
         chord_count = state.chord_count if state.chord_count else 0
         start_hole = state.start_hole if state.start_hole else 0
-        stitcher.draw_sequence(list(state.lengths), chord_count, start_hole)
+        stitcher.draw_sequence(state.lengths, chord_count, start_hole)
 
     stitcher.render(out)
 
 
-@dataclass
+@dataclass(frozen=True)
 class Theme:
     """Circle Stitcher visual theme."""
 
@@ -148,7 +153,7 @@ class Theme:
     hole_stroke: str
     chord_front_color: str
     chord_back_color: str
-    sequence_colors: list[str]
+    sequence_colors: tuple[str, ...]
 
 
 DEFAULT_THEME = Theme(
@@ -160,20 +165,110 @@ DEFAULT_THEME = Theme(
     hole_stroke="#333333",
     chord_front_color="#2B8FF3",
     chord_back_color="#F50C00",
-    sequence_colors=["#000000", "#099A3C", "#8B1828", "#515F45"],
+    sequence_colors=("#000000", "#099A3C", "#8B1828", "#515F45"),
 )
 
 
+_STYLE_TEMPLATE = """
+.hole circle {{
+    fill: {hole_fill};
+    stroke: {hole_stroke};
+    r: {hole_r}px;
+}}
+.index {{
+    font-size: {hole_font_size}px;
+    text-anchor: middle;
+}}
+.front {{
+    fill: none;
+    stroke: {chord_front_color};
+    stroke-width: {chord_width};
+}}
+.back {{
+    fill: none;
+    stroke: {chord_back_color};
+    stroke-width: {chord_width};
+}}
+.summary {{
+    font-size: {summary_font_size}px;
+}}
+"""
+
+_SEQUENCE_STYLE_TEMPLATE = """
+.seq{index} {{
+    fill: {color}
+}}
+"""
+
+
+@functools.lru_cache(maxsize=32)
+def _build_style(
+    theme: Theme,
+    hole_r: float,
+    chord_width: str,
+    hole_font_size: float,
+    summary_font_size: float,
+) -> str:
+    """Build the CSS stylesheet text for a theme."""
+    sequence_style = "".join(
+        _SEQUENCE_STYLE_TEMPLATE.format(index=index, color=color)
+        for index, color in enumerate(theme.sequence_colors)
+    )
+    return (
+        _STYLE_TEMPLATE.format(
+            hole_fill=theme.hole_fill,
+            hole_stroke=theme.hole_stroke,
+            hole_r=hole_r,
+            hole_font_size=hole_font_size,
+            chord_front_color=theme.chord_front_color,
+            chord_back_color=theme.chord_back_color,
+            chord_width=chord_width,
+            summary_font_size=summary_font_size,
+        )
+        + sequence_style
+    )
+
+
+def _unit_hole_positions(
+    holes: int, k: float, sides: int, m: float
+) -> list[tuple[float, float]]:
+    """Calculate hole positions on a shape of radius 1 centered on 0, 0.
+
+    Hole 0 is to the right and counting is clockwise.
+    """
+    rad_per_hole = 2 * math.pi / holes
+    if k == 0:
+        # A circle, the number of sides and m don't matter
+        return [
+            (math.cos(index * rad_per_hole), math.sin(index * rad_per_hole))
+            for index in range(holes)
+        ]
+
+    m_pi = math.pi * m
+    dbl_sides = 2 * sides
+    numerator = math.cos((2 * math.asin(k) + m_pi) / dbl_sides)
+
+    positions = []
+    for index in range(holes):
+        rad = index * rad_per_hole
+        denominator = math.cos(
+            (2 * math.asin(k * math.cos(sides * rad)) + m_pi) / dbl_sides
+        )
+        p = numerator / denominator
+        positions.append((math.cos(rad) * p, math.sin(rad) * p))
+    return positions
+
+
 class CircleStitcher:
     """Draw stitches around a circle following a prescribed pattern."""
 
     def __init__(self) -> None:
-        self.svg_width = 350
-        self.svg_height = 350
+        self.svg_width: float = 350
+        self.svg_height: float = 350
         self.svg_scaling = 2
 
-        self.circle_r = 70
-        self.empty_circle_r = 60
+        self.circle_r: float = 70
+        self.empty_circle_r: float = 60
 
         self.units: float = PX_PER_INCH
 
@@ -194,18 +289,24 @@ class CircleStitcher:
 
         self.hole_font_size = 8
 
-        self.elements: list[svg.Element] = []
+        # Hot elements like chords and index labels are stored as SVG markup
+        self.elements: list[svg.Element | str] = []
+
+        # Hole positions on a unit sized shape, built on first use
+        self._unit_xy: list[tuple[float, float]] | None = None
+        # Hole positions formatted for output keyed by radius and center
+        self._formatted_xy: dict[tuple[float, float, float], list[tuple[str, str]]] = {}
 
         self.holes = 32
 
         # Controls for the roundness of the needle hole pattern
         # How much the circle pushes in or out
         # 0 makes a circle so the number of sides and m don't matter
-        self.k: float = 0
+        self.k = 0
         # Number of sides of the shape
-        self.sides: int = 1
+        self.sides = 1
         # Number of points on each edge
-        self.m: float = 0
+        self.m = 0
 
         self.outer_ring = 0
         self.cur_sequence = 0
@@ -218,7 +319,49 @@ class CircleStitcher:
     @holes.setter
     def holes(self, holes: int) -> None:
         self._holes = holes
-        self.hole_usage = [0] * holes
+        self._reset_hole_usage()
+        self._clear_positions()
+        # Turn index labels so the bottom is toward the center
+        self._label_angles = [round(self.hole_angle(i) + 90, 1) for i in range(holes)]
+
+    def _clear_positions(self) -> None:
+        """Forget hole positions after the shape changed."""
+        self._unit_xy = None
+        self._formatted_xy.clear()
+
+    def _reset_hole_usage(self) -> None:
+        """Forget how many index labels have been drawn next to each hole."""
+        self.hole_usage = [0] * self.holes
+
+    @property
+    def k(self) -> float:
+        """Get pointiness of the shape."""
+        return self._k
+
+    @k.setter
+    def k(self, k: float) -> None:
+        self._k = k
+        self._clear_positions()
+
+    @property
+    def sides(self) -> int:
+        """Get number of sides of the shape."""
+        return self._sides
+
+    @sides.setter
+    def sides(self, sides: int) -> None:
+        self._sides = sides
+        self._clear_positions()
+
+    @property
+    def m(self) -> float:
+        """Get number of points on each side of the shape."""
+        return self._m
+
+    @m.setter
+    def m(self, m: float) -> None:
+        self._m = m
+        self._clear_positions()
 
     @property
     def center_x(self) -> float:
@@ -232,18 +375,18 @@ class CircleStitcher:
 
     def render(self, out: click.utils.LazyFile) -> None:
         """Write SVG to disk."""
-        doc = svg.SVG(
-            width=self.svg_width * self.svg_scaling,
-            height=self.svg_height * self.svg_scaling,
-            viewBox=svg.ViewBoxSpec(
-                min_x=0, min_y=0, width=self.svg_width, height=self.svg_width
-            ),
-            elements=self.elements,
+        view_box = svg.ViewBoxSpec(
+            min_x=0, min_y=0, width=self.svg_width, height=self.svg_width
         )
-
-        out.write(f"<!--\nMade with {SOFTWARE_NAME}\n{URL}\n-->\n")
-        out.write(str(doc))
-        out.write("\n")
+        out.write(
+            f"<!--\nMade with {SOFTWARE_NAME}\n{URL}\n-->\n"
+            f'<svg xmlns="{SVG_NAMESPACE}" viewBox="{view_box}"'
+            f' width="{self.svg_width * self.svg_scaling}"'
+            f' height="{self.svg_height * self.svg_scaling}">'
+        )
+        # Stream the elements so the whole document is never held in memory
+        out.writelines(str(element) for element in self.elements)
+        out.write("</svg>\n")
 
     def draw(self) -> None:
         """Render the drawing."""
@@ -277,40 +420,15 @@ class CircleStitcher:
 
     def _add_stylesheet(self) -> None:
         """Add stylesheet to SVG document."""
-        sequence_style = []
-        for index, color in enumerate(self.theme.sequence_colors):
-            sequence_style.append(
-                dedent(f"""
-                .seq{index} {{
-                    fill: {color}
-                }}
-            """)
-            )
         self.elements.append(
             svg.Style(
-                text=dedent(f"""
-                .hole {{
-                    fill: {self.theme.hole_fill};
-                    stroke: {self.theme.hole_stroke};
-                    r: {self.hole_r}px;
-                }}
-                .index {{
-                    font-size: {self.hole_font_size}px;
-                    text-anchor: middle;
-                }}
-                .front {{
-                    stroke: {self.theme.chord_front_color};
-                    stroke-width: {self.chord_width};
-                }}
-                .back {{
-                    stroke: {self.theme.chord_back_color};
-                    stroke-width: {self.chord_width};
-                }}
-                .summary {{
-                    font-size: {self.summary_font_size}px;
-                }}
-            """)
-                + "".join(sequence_style)
+                text=_build_style(
+                    self.theme,
+                    self.hole_r,
+                    self.chord_width,
+                    self.hole_font_size,
+                    self.summary_font_size,
+                )
             )
         )
 
@@ -341,14 +459,14 @@ class CircleStitcher:
 
     def draw_holes(self) -> None:
         """Draw perimeter needle holes."""
-        for i in range(self.holes):
-            cx, cy = self.hole_to_xy(i)
-            self.elements.append(
-                svg.Circle(cx=round(cx, 1), cy=round(cy, 1), class_=["hole"])
-            )
+        circles = "".join(
+            f'<circle cx="{cx}" cy="{cy}"/>'
+            for cx, cy in self._formatted_positions(self.circle_r)
+        )
+        self.elements.append(f'<g class="hole">{circles}</g>')
 
     def draw_sequence(
-        self, lengths: list[int], chord_count: int = 0, start_hole: int = 0
+        self, lengths: Sequence[int], chord_count: int = 0, start_hole: int = 0
     ) -> None:
         """Draw stitches around the circle following the stitch pattern."""
         gen = self.create_sequence(lengths, chord_count, start_hole)
@@ -356,71 +474,76 @@ class CircleStitcher:
         self.draw_summary_text(lengths, total_length)
 
         self.outer_ring += max(self.hole_usage)
-        self.holes = self.holes  # Reset self.hole_usage
+        self._reset_hole_usage()
 
         self.create_shell()
 
         self.cur_sequence += 1
 
     def create_sequence(
-        self, lengths: list[int], chord_count: int = 0, start_hole: int = 0
+        self, lengths: Sequence[int], chord_count: int = 0, start_hole: int = 0
     ) -> Generator[tuple[int, int], None, None]:
-        """Generate stitches around the circle following the stitch pattern."""
+        """Generate stitches around the circle following the stitch pattern.
+
+        Without a chord count the pattern runs until it is back at the start
+        hole at the start of lengths.
+        """
+        holes = self.holes
+        if not chord_count > 0:
+            # Every pass through lengths advances sum(lengths) holes
+            passes = holes // math.gcd(holes, sum(lengths))
+            chord_count = passes * len(lengths)
+
         index = start_hole
-        first = True
-
-        len_cycle = itertools.cycle(lengths)
-
-        for _ in range(chord_count if chord_count else 10000):
-            increment = next(len_cycle)
-            if (
-                not chord_count > 0
-                and not first
-                and increment == lengths[0]
-                and index == start_hole
-            ):
-                break
+        for increment in itertools.islice(itertools.cycle(lengths), chord_count):
             end_index = index + increment
             yield index, end_index
 
-            index = end_index % self.holes
-            first = False
+            index = end_index % holes
 
     def draw_chords(self, gen: Generator[tuple[int, int], None, None]) -> float:
         """Draw stitches around the circle following the stitch pattern."""
-        front = True
-        first = True
-
-        count = 1
-        total_length = 0.0
-
-        for index, end_index in gen:
-            if first:
-                self.elements.append(self.stroke_index(index, count))
-                count += 1
-
-            self.elements.append(self.stroke_chord(index, end_index, front))
-            self.elements.append(self.stroke_index(end_index, count))
-
-            x1, y1 = self.hole_to_xy(index)
-            x2, y2 = self.hole_to_xy(end_index)
-
-            total_length += math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
+        chords = list(gen)
+
+        # Chord lengths scale with the radius so sum them on the unit shape
+        unit_xy = self._unit_positions()
+        holes = self.holes
+        total_length = self.circle_r * sum(
+            math.dist(unit_xy[index % holes], unit_xy[end_index % holes])
+            for index, end_index in chords
+        )
 
-            front = not front
-            count += 1
-            first = False
+        if not chords:
+            return total_length
+
+        # Chords alternate sides of the card so each side is a single path
+        segments = [self.stroke_chord(index, end_index) for index, end_index in chords]
+        front_d = " ".join(segments[::2])
+        self.elements.append(f'<path class="front" d="{front_d}"/>')
+        if len(segments) > 1:
+            back_d = " ".join(segments[1::2])
+            self.elements.append(f'<path class="back" d="{back_d}"/>')
+
+        # The labels share one group so the class is only written once
+        labels = [self.stroke_index(chords[0][0], 1)]
+        labels.extend(
+            self.stroke_index(end_index, count)
+            for count, (_, end_index) in enumerate(chords, start=2)
+        )
+        self.elements.append(
+            f'<g class="index {self.sequence_class}">{"".join(labels)}</g>'
+        )
 
         return total_length
 
-    def draw_summary_text(self, lengths: list[int], total_length: float) -> None:
+    def draw_summary_text(self, lengths: Sequence[int], total_length: float) -> None:
         """Draw summary about sequence.
 
         Summary includes the steps in the sequence and total length.
         """
         self.elements.append(
             svg.Text(
-                text="Sequence: " + ", ".join([str(x) for x in lengths]),
+                text="Sequence: " + ", ".join(map(str, lengths)),
                 x=self.summary_text_x,
                 y=self.summary_text_y,
                 class_=["summary", self.sequence_class],
@@ -445,46 +568,35 @@ class CircleStitcher:
         r_offset = self.hole_font_size * (self.outer_ring + 1)
         r = self.circle_r + r_offset
 
-        path: list[svg.PathData] = []
-        first = True
-        for hole in range(self.holes):
-            x, y = self.hole_to_xy(hole, r)
-            command = svg.MoveTo if first else svg.LineTo
-            path.append(command(round(x, 1), round(y, 1)))
-            first = False
-        path.append(svg.ClosePath())
+        points = " L".join(f"{x},{y}" for x, y in self._formatted_positions(r))
         self.elements.append(
-            svg.Path(d=path, fill_opacity=0, stroke=self.theme.empty_circle_stroke)
+            f'<path d="M{points} Z" fill-opacity="0"'
+            f' stroke="{self.theme.empty_circle_stroke}"/>'
         )
 
-    def stroke_chord(self, hole1: int, hole2: int, front: bool) -> svg.Line:
-        """Draw a circle chord."""
-        x1, y1 = self.hole_to_xy(hole1)
-        x2, y2 = self.hole_to_xy(hole2)
-        cls = "front" if front else "back"
-        return svg.Line(
-            x1=round(x1, 1),
-            y1=round(y1, 1),
-            x2=round(x2, 1),
-            y2=round(y2, 1),
-            class_=[cls],
-        )
+    def stroke_chord(self, hole1: int, hole2: int) -> str:
+        """Draw a circle chord as SVG path data."""
+        positions = self._formatted_positions(self.circle_r)
+        holes = self.holes
+        x1, y1 = positions[hole1 % holes]
+        x2, y2 = positions[hole2 % holes]
+        return f"M{x1},{y1} L{x2},{y2}"
+
+    def stroke_index(self, hole: int, count: int) -> str:
+        """Draw the text next to a hole for where it is in the sequence.
 
-    def stroke_index(self, hole: int, count: int) -> svg.Text:
-        """Draw the text next to a hole for where it is in the sequence."""
-        uses = self.hole_usage[hole % self.holes]
+        The text is returned as an SVG text element to be placed in a group
+        carrying the index and sequence classes.
+        """
+        hole %= self.holes
+        uses = self.hole_usage[hole]
         r_offset = self.hole_font_size * (self.outer_ring + uses + 1) + 1
-        x, y = self.hole_to_xy(hole, self.circle_r + r_offset)
-        # Turn the text so the bottom is toward the center
-        angle = self.hole_angle(hole) + 90
-
-        self.hole_usage[hole % self.holes] += 1
-        return svg.Text(
-            text=str(count),
-            x=round(x, 1),
-            y=round(y, 1),
-            class_=["index", self.sequence_class],
-            transform=[svg.Rotate(round(angle, 1), round(x, 1), round(y, 1))],
+        x, y = self._formatted_positions(self.circle_r + r_offset)[hole]
+        angle = self._label_angles[hole]
+
+        self.hole_usage[hole] = uses + 1
+        return (
+            f'<text transform="rotate({angle} {x} {y})" x="{x}" y="{y}">{count}</text>'
         )
 
     def hole_to_xy(self, index: int, r: float = 0) -> tuple[float, float]:
@@ -494,21 +606,37 @@ class CircleStitcher:
         """
         if r == 0:
             r = self.circle_r
-        rad = self.hole_angle(index) * (math.pi / 180)
-        m_pi = math.pi * self.m
+        ux, uy = self._unit_positions()[index % self.holes]
+        return self.center_x + r * ux, self.center_y + r * uy
 
-        dbl_sides = 2 * self.sides
-        numerator = math.cos((2 * math.asin(self.k) + m_pi) / dbl_sides)
-        denominator = math.cos(
-            (2 * math.asin(self.k * math.cos(self.sides * rad)) + m_pi) / dbl_sides
-        )
-        p = numerator / denominator
+    def holes_to_xy(self, r: float = 0) -> list[tuple[float, float]]:
+        """Convert every hole number to x, y coordinates.
+
+        Same as calling hole_to_xy for each hole but in a single pass.
+        """
+        if r == 0:
+            r = self.circle_r
+        cx = self.center_x
+        cy = self.center_y
+        return [(cx + r * ux, cy + r * uy) for ux, uy in self._unit_positions()]
 
-        x = r * math.cos(rad) * p
-        y = r * math.sin(rad) * p
-        cx = self.center_x + x
-        cy = self.center_y + y
-        return cx, cy
+    def _unit_positions(self) -> list[tuple[float, float]]:
+        """Get hole positions on a unit sized shape, building them if needed."""
+        if self._unit_xy is None:
+            self._unit_xy = _unit_hole_positions(self.holes, self.k, self.sides, self.m)
+        return self._unit_xy
+
+    def _formatted_positions(self, r: float) -> list[tuple[str, str]]:
+        """Get positions of all holes at radius r formatted for output.
+
+        Coordinates are rounded to one decimal place.
+        """
+        key = (r, self.center_x, self.center_y)
+        positions = self._formatted_xy.get(key)
+        if positions is None:
+            positions = [(f"{x:.1f}", f"{y:.1f}") for x, y in self.holes_to_xy(r)]
+            self._formatted_xy[key] = positions
+        return positions
 
     def hole_angle(self, index: int) -> float:
         """Calculate hole's angle on the circle.
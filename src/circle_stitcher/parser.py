@@ -1,51 +1,140 @@
 """Language parser."""
 
-import pyparsing as pp
-
-W_lit = pp.Literal("W")
-H_lit = pp.Literal("H")
-OC_lit = pp.Literal("OC")
-IC_lit = pp.Literal("IC")
-
-K_lit = pp.Literal("K")
-N_lit = pp.Literal("N")
-M_lit = pp.Literal("M")
-
-L_lit = pp.Literal("L")
-S_lit = pp.Literal("S")
-C_lit = pp.Literal("C")
-
-integer = pp.Word(pp.nums)
-integer.set_parse_action(lambda tokens: int(tokens[0]))
-
-k_option = K_lit + pp.pyparsing_common.fnumber("k")
-n_option = N_lit + integer("n")
-m_option = M_lit + integer("m")
-
-size_option = W_lit + pp.pyparsing_common.fnumber("size")
-h_option = H_lit + integer("holes")
-outer_circle_option = OC_lit + pp.pyparsing_common.fnumber("outer_circle")
-inner_circle_option = IC_lit + pp.pyparsing_common.fnumber("inner_circle")
-l_option = L_lit + pp.DelimitedList(integer)("lengths")
-s_option = S_lit + integer("start_hole")
-c_option = C_lit + integer("chord_count")
-
-statement = l_option + pp.Opt(s_option) + pp.Opt(c_option)
-preamble = (
-    pp.Opt(size_option)
-    + pp.Opt(h_option)
-    + pp.Opt(outer_circle_option)
-    + pp.Opt(k_option)
-    + pp.Opt(n_option)
-    + pp.Opt(m_option)
-    + pp.Opt(inner_circle_option)
-)
-
-grammar = preamble + pp.Opt(
-    pp.DelimitedList(pp.Group(statement), delim=";")("statements")
-)
-
-
-def parse(commands: str) -> pp.ParseResults:
-    """Parse Circle Stitcher language string."""
-    return grammar.parse_string(commands)
+import functools
+import re
+from dataclasses import dataclass
+
+# Digits and whitespace are ASCII only, following the documented grammar.
+# pyparsing's real number regex also took Unicode digits for W, OC, K and IC,
+# so rejecting them there is a deliberate narrowing.
+_WHITESPACE = re.compile(r"[ \t\n\r]+")
+_INTEGER = re.compile(r"[0-9]+")
+_NUMBER = re.compile(r"[+-]?[0-9]+\.?[0-9]*(?:[eE][+-]?[0-9]+)?")
+
+
+class ParseError(ValueError):
+    """Raised when a Circle Stitcher language string is invalid."""
+
+
+@dataclass(frozen=True)
+class Statement:
+    """A single stitch sequence."""
+
+    lengths: tuple[int, ...]
+    start_hole: int | None = None
+    chord_count: int | None = None
+
+
+@dataclass(frozen=True)
+class Results:
+    """Global options and stitch sequences of a Circle Stitcher program."""
+
+    size: float | None = None
+    holes: int | None = None
+    outer_circle: float | None = None
+    k: float | None = None
+    n: int | None = None
+    m: int | None = None
+    inner_circle: float | None = None
+    statements: tuple[Statement, ...] = ()
+
+
+class _Scanner:
+    """Walk through a Circle Stitcher language string one token at a time."""
+
+    def __init__(self, commands: str) -> None:
+        self.commands = commands
+        self.pos = 0
+
+    def _skip_whitespace(self) -> None:
+        """Move past any whitespace before the next token."""
+        match = _WHITESPACE.match(self.commands, self.pos)
+        if match:
+            self.pos = match.end()
+
+    def literal(self, text: str) -> bool:
+        """Consume text if it is the next token."""
+        self._skip_whitespace()
+        if self.commands.startswith(text, self.pos):
+            self.pos += len(text)
+            return True
+        return False
+
+    def integer(self) -> int:
+        """Consume an integer."""
+        return int(self._match(_INTEGER, "an integer"))
+
+    def number(self) -> float:
+        """Consume an integer or real number."""
+        return float(self._match(_NUMBER, "a number"))
+
+    def at_end(self) -> bool:
+        """Whether only whitespace is left."""
+        self._skip_whitespace()
+        return self.pos == len(self.commands)
+
+    def error(self, expected: str) -> ParseError:
+        """Create an error for an unexpected token at the current position."""
+        return ParseError(f"Expected {expected}, at char {self.pos}")
+
+    def _match(self, pattern: re.Pattern[str], expected: str) -> str:
+        """Consume the text matching pattern."""
+        self._skip_whitespace()
+        match = pattern.match(self.commands, self.pos)
+        if not match:
+            raise self.error(expected)
+        self.pos = match.end()
+        return match.group()
+
+
+@functools.lru_cache(maxsize=256)
+def parse(commands: str) -> Results:
+    """Parse Circle Stitcher language string.
+
+    Results are immutable so repeated parses of the same string are shared.
+    Raises ParseError if the whole string isn't valid Circle Stitcher language.
+    """
+    scanner = _Scanner(commands)
+
+    # Global options can each be left out but must be in this order
+    size = scanner.number() if scanner.literal("W") else None
+    holes = scanner.integer() if scanner.literal("H") else None
+    outer_circle = scanner.number() if scanner.literal("OC") else None
+    k = scanner.number() if scanner.literal("K") else None
+    n = scanner.integer() if scanner.literal("N") else None
+    m = scanner.integer() if scanner.literal("M") else None
+    inner_circle = scanner.number() if scanner.literal("IC") else None
+
+    statements = []
+    if scanner.literal("L"):
+        statements.append(_parse_statement(scanner))
+        while scanner.literal(";"):
+            if not scanner.literal("L"):
+                raise scanner.error('"L"')
+            statements.append(_parse_statement(scanner))
+
+    if not scanner.at_end():
+        raise scanner.error("end of text")
+
+    return Results(
+        size=size,
+        holes=holes,
+        outer_circle=outer_circle,
+        k=k,
+        n=n,
+        m=m,
+        inner_circle=inner_circle,
+        statements=tuple(statements),
+    )
+
+
+def _parse_statement(scanner: _Scanner) -> Statement:
+    """Parse a stitch sequence following its L."""
+    lengths = [scanner.integer()]
+    while scanner.literal(","):
+        lengths.append(scanner.integer())
+    start_hole = scanner.integer() if scanner.literal("S") else None
+    chord_count = scanner.integer() if scanner.literal("C") else None
+    return Statement(
+        lengths=tuple(lengths), start_hole=start_hole, chord_count=chord_count
+    )
@@ -43,6 +43,14 @@ def test_main_mm(runner: CliRunner, chtmpdir: Path) -> None:
     assert result.exit_code == 0
 
 
+def test_main_invalid_commands(runner: CliRunner, chtmpdir: Path) -> None:
+    """It exits with a usage error for invalid commands."""
+    args = ["--out", str(chtmpdir / "test.svg"), "L 18,1 Q"]
+    result = runner.invoke(main, args=args)
+    assert result.exit_code == 2
+    assert "Invalid value for COMMANDS" in result.output
+
+
 def test_draw_background(stitcher: CircleStitcher) -> None:
     """Tests draw_background."""
     stitcher.draw_background()
@@ -68,27 +76,14 @@ def test_draw_holes() -> None:
 
     small.draw_holes()
 
-    elements = small.elements
-    assert len(elements) == 4
-    assert isinstance(elements[0], svg.Circle)
-    assert elements[0].class_ == ["hole"]
-    assert elements[0].cx == pytest.approx(600.0)
-    assert elements[0].cy == pytest.approx(500.0)
-
-    assert isinstance(elements[1], svg.Circle)
-    assert elements[1].class_ == ["hole"]
-    assert elements[1].cx == pytest.approx(500.0)
-    assert elements[1].cy == pytest.approx(600.0)
-
-    assert isinstance(elements[2], svg.Circle)
-    assert elements[2].class_ == ["hole"]
-    assert elements[2].cx == pytest.approx(400.0)
-    assert elements[2].cy == pytest.approx(500.0)
-
-    assert isinstance(elements[3], svg.Circle)
-    assert elements[3].class_ == ["hole"]
-    assert elements[3].cx == pytest.approx(500.0)
-    assert elements[3].cy == pytest.approx(400.0)
+    assert small.elements == [
+        '<g class="hole">'
+        '<circle cx="600.0" cy="500.0"/>'
+        '<circle cx="500.0" cy="600.0"/>'
+        '<circle cx="400.0" cy="500.0"/>'
+        '<circle cx="500.0" cy="400.0"/>'
+        "</g>"
+    ]
 
 
 def test_create_sequence(stitcher: CircleStitcher) -> None:
@@ -102,6 +97,11 @@ def test_create_sequence(stitcher: CircleStitcher) -> None:
     seq = list(stitcher.create_sequence([7, 1], chord_count=2, start_hole=2))
     assert seq == [(2, 9), (9, 10)]
 
+    # Returning to the start hole part way through lengths doesn't end it
+    seq = list(stitcher.create_sequence([4, 2, 4]))
+    assert len(seq) == 24
+    assert seq[-1] == (12, 16)
+
 
 def test_draw_chords(stitcher: CircleStitcher) -> None:
     """Tests draw_chords."""
@@ -111,14 +111,31 @@ def test_draw_chords(stitcher: CircleStitcher) -> None:
     assert total_length == pytest.approx(282.8427)
 
     elements = stitcher.elements
-    assert len(elements) == 5
-    assert elements[0].text == "1"
-    assert isinstance(elements[1], svg.Line)
-    assert elements[1].class_ == ["front"]
-    assert elements[2].text == "2"
-    assert isinstance(elements[3], svg.Line)
-    assert elements[3].class_ == ["back"]
-    assert elements[4].text == "3"
+    assert elements[:2] == [
+        '<path class="front" d="M600.0,500.0 L500.0,600.0"/>',
+        '<path class="back" d="M500.0,600.0 L400.0,500.0"/>',
+    ]
+    assert len(elements) == 3
+    labels = elements[2]
+    assert isinstance(labels, str)
+    assert labels.startswith('<g class="index seq0"><text ')
+    assert labels.endswith(">3</text></g>")
+    assert labels.count("<text ") == 3
+
+    # A single chord only has a front side
+    stitcher.elements = []
+    stitcher.draw_chords(x for x in chords[:1])
+    assert elements[0] == stitcher.elements[0]
+    assert len(stitcher.elements) == 2
+
+    stitcher.cur_sequence = 1
+    stitcher.draw_chords(x for x in chords[:1])
+    labels = stitcher.elements[-1]
+    assert isinstance(labels, str)
+    assert labels.startswith('<g class="index seq1">')
+
+    assert stitcher.draw_chords(x for x in chords[:0]) == 0
+    assert len(stitcher.elements) == 4
 
 
 def test_draw_summary_text(stitcher: CircleStitcher) -> None:
@@ -144,41 +161,40 @@ def test_draw_summary_text(stitcher: CircleStitcher) -> None:
 
 def test_stroke_chord(stitcher: CircleStitcher) -> None:
     """Tests stroke_chord."""
-    line = stitcher.stroke_chord(0, 8, front=True)
-    assert line.class_ == ["front"]
-    assert line.x1 == pytest.approx(600.0)
-    assert line.y1 == pytest.approx(500.0)
-    assert line.x2 == pytest.approx(400.0)
-    assert line.y2 == pytest.approx(500.0)
+    d = stitcher.stroke_chord(0, 8)
+    assert d == "M600.0,500.0 L400.0,500.0"
 
-    line = stitcher.stroke_chord(4, 12, front=False)
-    assert line.class_ == ["back"]
-    assert line.x1 == pytest.approx(500.0)
-    assert line.y1 == pytest.approx(600.0)
-    assert line.x2 == pytest.approx(500.0)
-    assert line.y2 == pytest.approx(400.0)
+    # Holes past the last one wrap around
+    d = stitcher.stroke_chord(4, 28)
+    assert d == "M500.0,600.0 L500.0,400.0"
 
 
 def test_stroke_index(stitcher: CircleStitcher) -> None:
     """Tests stroke_index."""
     text = stitcher.stroke_index(2, 1)
-    assert text.text == "1"
-    assert text.x == pytest.approx(577.1)
-    assert text.y == pytest.approx(577.1)
-    assert text.transform
-    assert len(text.transform) == 1
-    assert isinstance(text.transform[0], svg.Rotate)
-    assert text.transform[0].a == pytest.approx(135.0)
+    assert text == (
+        '<text transform="rotate(135.0 577.1 577.1)" x="577.1" y="577.1">1</text>'
+    )
 
     # Second label at the same hole is offset further from the center
     text = stitcher.stroke_index(2, 2)
-    assert text.text == "2"
-    assert text.x == pytest.approx(582.7)
-    assert text.y == pytest.approx(582.7)
-    assert text.transform
-    assert len(text.transform) == 1
-    assert isinstance(text.transform[0], svg.Rotate)
-    assert text.transform[0].a == pytest.approx(135.0)
+    assert text == (
+        '<text transform="rotate(135.0 582.7 582.7)" x="582.7" y="582.7">2</text>'
+    )
+
+    # Holes past the last one wrap around to the same angle
+    text = stitcher.stroke_index(18, 3)
+    assert 'transform="rotate(135.0 588.4 588.4)"' in text
+
+
+def test_create_shell(stitcher: CircleStitcher) -> None:
+    """Tests create_shell."""
+    stitcher.holes = 4
+    stitcher.create_shell()
+    assert stitcher.elements[-1] == (
+        '<path d="M608.0,500.0 L500.0,608.0 L392.0,500.0 L500.0,392.0 Z"'
+        ' fill-opacity="0" stroke="#dddddd"/>'
+    )
 
 
 def test_hole_to_xy(stitcher: CircleStitcher) -> None:
@@ -193,6 +209,33 @@ def test_hole_to_xy(stitcher: CircleStitcher) -> None:
     assert stitcher.hole_to_xy(2, r=200) == pytest.approx((641.4213, 641.4213))
 
 
+def test_holes_to_xy(stitcher: CircleStitcher) -> None:
+    """Tests holes_to_xy."""
+    positions = stitcher.holes_to_xy()
+    assert len(positions) == 16
+    for hole, position in enumerate(positions):
+        assert position == pytest.approx(stitcher.hole_to_xy(hole))
+
+    assert stitcher.holes_to_xy(r=200)[2] == pytest.approx((641.4213, 641.4213))
+
+
+def test_hole_to_xy_shape_change(stitcher: CircleStitcher) -> None:
+    """Changing the shape moves the holes."""
+    assert stitcher.hole_to_xy(1) == pytest.approx((592.3879, 538.2683))
+    stitcher.k = 0.5
+    stitcher.sides = 4
+    assert stitcher.hole_to_xy(1) == pytest.approx((591.5975, 537.9409))
+    stitcher.holes = 8
+    assert stitcher.hole_to_xy(2) == pytest.approx((500.0, 600.0))
+
+
+def test_hole_to_xy_circle(stitcher: CircleStitcher) -> None:
+    """Sides and m don't change a circle."""
+    stitcher.sides = 1
+    stitcher.m = 1
+    assert stitcher.hole_to_xy(1) == pytest.approx((592.3879, 538.2683))
+
+
 def test_hole_angle(stitcher: CircleStitcher) -> None:
     """Tests hole_angle."""
     assert stitcher.hole_angle(0) == 0.0
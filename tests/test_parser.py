@@ -0,0 +1,87 @@
+"""Test cases for the parser module."""
+
+import pytest
+
+from circle_stitcher import parser
+from circle_stitcher.parser import Results
+from circle_stitcher.parser import Statement
+
+
+def test_parse_minimum_input() -> None:
+    """It parses a single sequence with default globals."""
+    results = parser.parse("L 10,1")
+    assert results == Results(statements=(Statement(lengths=(10, 1)),))
+
+
+def test_parse_all_options() -> None:
+    """It parses every global option and multiple sequences."""
+    results = parser.parse("W 4 H 42 OC 1.1 K 0.8 N 6 M 3 IC 0.7 L 16,3 S 2 C 5 ; L 4")
+    assert results == Results(
+        size=4.0,
+        holes=42,
+        outer_circle=1.1,
+        k=0.8,
+        n=6,
+        m=3,
+        inner_circle=0.7,
+        statements=(
+            Statement(lengths=(16, 3), start_hole=2, chord_count=5),
+            Statement(lengths=(4,)),
+        ),
+    )
+
+
+def test_parse_globals_only() -> None:
+    """It parses globals without any sequences."""
+    results = parser.parse("H 16")
+    assert results.holes == 16
+    assert results.statements == ()
+
+
+def test_parse_without_whitespace() -> None:
+    """Whitespace between tokens is optional."""
+    assert parser.parse("W4H42OC2K0.5N5M1IC13L18,1S3C10;L4") == parser.parse(
+        "W 4 H 42 OC 2 K 0.5 N 5 M 1 IC 13 L 18, 1 S 3 C 10 ; L 4"
+    )
+
+
+def test_parse_numbers() -> None:
+    """Real number options accept signs and exponents."""
+    results = parser.parse("W 1e2 OC +2. K -0.5 L 1")
+    assert results.size == 100.0
+    assert results.outer_circle == 2.0
+    assert results.k == -0.5
+
+
+@pytest.mark.parametrize(
+    "commands",
+    [
+        "H 16.5 L 1",
+        "L 1,",
+        "L 1 ;",
+        "L 1 ; S 2",
+        "H -3",
+        "H 16 W 4",
+        "K L 1",
+        # Digits and whitespace outside ASCII
+        "H \u0661\u0666 L 3",
+        "W \u0664 L 1",
+        "K \u0660.5 L 1",
+        "L\u00a01",
+    ],
+)
+def test_parse_rejects_invalid_input(commands: str) -> None:
+    """It fails on misplaced or malformed options."""
+    with pytest.raises(parser.ParseError):
+        parser.parse(commands)
+
+
+def test_parse_rejects_trailing_input() -> None:
+    """It fails when part of the string isn't understood."""
+    with pytest.raises(parser.ParseError):
+        parser.parse("H 16 L 10,1 X 3")
+
+
+def test_parse_is_cached() -> None:
+    """Parsing the same string twice returns the same results."""
+    assert parser.parse("H 16 L 7,1 S 2") is parser.parse("H 16 L 7,1 S 2")